@@ -1,140 +1,301 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+import logging
+from logging.handlers import MemoryHandler
+import os
+import socket
 import sys
-import json
+import threading
+from contextlib import nullcontext
+import time
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import pandas as pd
 from datetime import datetime
+from urllib.parse import urlencode
+
+# Test output is buffered and flushed once at the end of each test; an error-level
+# record flushes it immediately so failures are never held back
+log = logging.getLogger('backend_test')
+log.setLevel(logging.INFO)
+log.propagate = False
+log_stream = logging.StreamHandler(sys.stdout)
+log_stream.setFormatter(logging.Formatter('%(message)s'))
+log_buffer = MemoryHandler(capacity=256, flushLevel=logging.ERROR, target=log_stream)
+log.addHandler(log_buffer)
+
+def log_block(lines, failed=False):
+    """Log one test's lines as a single record so tests running concurrently don't interleave"""
+    log.log(logging.ERROR if failed else logging.INFO, '\n'.join(lines))
+    log_buffer.flush()
+
+class UnixSocketConnection(HTTPConnection):
+    """HTTP connection over a Unix domain socket instead of TCP"""
+    socket_path = None
+
+    def _new_conn(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        # Raise urllib3's connect errors, as the TCP connection does, so connect
+        # retries apply to a missing or refusing socket
+        try:
+            sock.connect(self.socket_path)
+        except socket.timeout as e:
+            sock.close()
+            raise ConnectTimeoutError(self, f"Connection to {self.socket_path} timed out. (connect timeout={self.timeout})") from e
+        except OSError as e:
+            sock.close()
+            raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
+        return sock
+
+class UnixSocketConnectionPool(HTTPConnectionPool):
+    ConnectionCls = UnixSocketConnection
+
+    def __init__(self, socket_path, **kwargs):
+        super().__init__('localhost', **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.socket_path = self.socket_path
+        return conn
+
+class UnixSocketAdapter(HTTPAdapter):
+    """Send every request through one keep-alive pool bound to a Unix domain socket"""
+    def __init__(self, socket_path, **kwargs):
+        super().__init__(**kwargs)
+        self.socket_pool = UnixSocketConnectionPool(socket_path, maxsize=self._pool_maxsize)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self.socket_pool
+
+    def get_connection(self, url, proxies=None):
+        return self.socket_pool
+
+    def close(self):
+        super().close()
+        self.socket_pool.close()
+
+# Keys each endpoint's response must contain
+_SUMMARY_SAMPLE_KEYS = frozenset({'rows', 'date_range', 'unique_lineups', 'unique_profiles'})
+_SUMMARY_PLAN_KEYS = frozenset({'rows', 'date_range', 'unique_lineups'})
+_FORECAST_GENERATION_KEYS = frozenset({'message', 'total_forecast_points', 'unique_lineups', 'forecast_period'})
+_COMBINED_DATA_KEYS = frozenset({'data', 'total_rows'})
+_COMBINED_ROW_COLUMNS = frozenset({'Profile', 'Lineup', 'DATE', 'Actual', 'Plan', 'Forecast'})
+_LINEUP_DATA_KEYS = frozenset({'lineup', 'data', 'total_rows'})
+_FILTERED_DATA_KEYS = frozenset({'data', 'total_rows', 'filters_applied'})
+_YEARLY_SUMMARY_KEYS = frozenset({'yearly_data', 'available_years'})
+_YEAR_KEYS = frozenset({'year', 'months'})
+_MONTH_KEYS = frozenset({'month', 'month_name', 'actual', 'plan', 'forecast', 'synthetic_actual'})
+_HIERARCHY_OPTION_KEYS = frozenset({'profiles', 'line_items', 'bodies', 'sites', 'lineups'})
+
+def _validate_health(data):
+    return data.get('status') == 'healthy'
+
+def _validate_summary(data):
+    sample_data = data.get('sample_data')
+    plan_data = data.get('plan_data')
+    if not isinstance(sample_data, dict) or not isinstance(plan_data, dict):
+        return False
+    
+    return (_SUMMARY_SAMPLE_KEYS <= sample_data.keys() and
+            _SUMMARY_PLAN_KEYS <= plan_data.keys() and
+            sample_data['rows'] > 0 and plan_data['rows'] > 0)
+
+def _validate_hierarchy(data):
+    # Should return a nested dictionary structure
+    return isinstance(data, dict) and len(data) > 0
+
+def _validate_forecast_generation(data):
+    return (_FORECAST_GENERATION_KEYS <= data.keys() and
+            data['total_forecast_points'] > 0 and
+            data['unique_lineups'] > 0)
+
+def _validate_combined_data(data):
+    if not _COMBINED_DATA_KEYS <= data.keys():
+        return False
+        
+    # Check if data array has items with expected structure
+    if len(data['data']) > 0:
+        return not _COMBINED_ROW_COLUMNS.isdisjoint(data['data'][0])
+    return True
+
+def _validate_filtered_data(data):
+    return _FILTERED_DATA_KEYS <= data.keys()
+
+def _validate_yearly_summary(data):
+    if not _YEARLY_SUMMARY_KEYS <= data.keys():
+        return False
+    
+    # Check if yearly_data has proper structure
+    if len(data['yearly_data']) > 0:
+        year_data = data['yearly_data'][0]
+        if not _YEAR_KEYS <= year_data.keys():
+            return False
+        
+        # Check months structure
+        if len(year_data['months']) > 0:
+            return _MONTH_KEYS <= year_data['months'][0].keys()
+    
+    return True
+
+def _validate_hierarchy_options(data):
+    if not _HIERARCHY_OPTION_KEYS <= data.keys():
+        return False
+    
+    # Check if all are lists with content
+    return all(isinstance(data[key], list) and len(data[key]) > 0 for key in _HIERARCHY_OPTION_KEYS)
 
 class ForecastingAPITester:
+    # Fail fast when the backend can't be reached; reads keep the full 30s budget
+    # since forecast generation is slow
+    TIMEOUT = (3.05, 30)
+
+    # Fixed endpoints; their full URLs are built once per tester
+    ENDPOINTS = (
+        'api/health', 'api/data/summary', 'api/data/hierarchy', 'api/forecast/generate',
+        'api/data/combined', 'api/data/filtered', 'api/data/yearly-summary',
+        'api/data/hierarchy-options', 'api/export/csv'
+    )
+
     def __init__(self, base_url="https://805b056d-d979-4878-b784-e89e50fd864c.preview.emergentagent.com"):
-        self.base_url = base_url
+        self.base_url = base_url.rstrip('/')
+        self.urls = {endpoint: f"{self.base_url}/{endpoint}" for endpoint in self.ENDPOINTS}
         self.tests_run = 0
         self.tests_passed = 0
         self.forecast_generated = False
+        # Pass/fail per test name, read back for the key features summary
+        self.results = {}
+        # TEST_VERBOSE=1 prints a preview of each response body
+        self.verbose = bool(int(os.getenv('TEST_VERBOSE', '0')))
+        # TEST_FAST_FAIL=1 checks the CSV export with HEAD before downloading it
+        self.fast_fail = bool(int(os.getenv('TEST_FAST_FAIL', '0')))
+        # Errors reported as a failed test rather than aborting the run
+        self.request_errors = (requests.RequestException,)
+        # Tests run concurrently from a thread pool; guards the counters
+        self.lock = threading.Lock()
+        # One session for every request so connections (and TLS handshakes) are reused
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        # Transient gateway errors and dropped connections (e.g. a cold backend) are
+        # retried with backoff inside the connection pool instead of failing the run;
+        # read timeouts are not, so a slow generate is never posted again
+        retry = Retry(total=3, read=False, backoff_factor=0.2, status_forcelist=[502, 503, 504],
+                      allowed_methods=['GET', 'POST'], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # TEST_UDS=/path/to.sock talks to a local backend started with FORECAST_UDS,
+        # skipping the loopback TCP stack; base_url (http or https) then only supplies the paths
+        socket_path = os.getenv('TEST_UDS')
+        if socket_path:
+            socket_adapter = UnixSocketAdapter(socket_path, pool_maxsize=16, max_retries=retry)
+            self.session.mount('http://', socket_adapter)
+            self.session.mount('https://', socket_adapter)
 
     def run_test(self, name, method, endpoint, expected_status, data=None, check_response=None):
         """Run a single API test"""
-        url = f"{self.base_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
+        url = self.urls.get(endpoint) or f"{self.base_url}/{endpoint}"
 
-        self.tests_run += 1
-        print(f"\n🔍 Testing {name}...")
-        print(f"   URL: {url}")
+        with self.lock:
+            self.tests_run += 1
+        lines = [f"\n🔍 Testing {name}...", f"   URL: {url}"]
         
+        start = time.perf_counter()
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = self.session.request(method, url, json=data, timeout=self.TIMEOUT)
+        except self.request_errors as e:
+            # Timeout, ConnectionError and the rest of requests' errors share this base
+            lines.append(f"❌ Failed - {'Request timeout' if isinstance(e, requests.Timeout) else f'Error: {e}'}")
+            log_block(lines, failed=True)
+            self.results[name] = False
+            return False, {}
 
-            print(f"   Status Code: {response.status_code}")
-            
-            success = response.status_code == expected_status
+        lines.append(f"   Status Code: {response.status_code} ({(time.perf_counter() - start) * 1000:.1f}ms)")
+        
+        success = response.status_code == expected_status
+        response_data = {}
+        
+        if success:
+            try:
+                response_data = orjson.loads(response.content)
+                if self.verbose:
+                    # Preview the raw body instead of re-serializing the whole decoded payload;
+                    # only the previewed bytes are decoded
+                    lines.append(f"   Response: {response.content[:200].decode('utf-8', 'replace')}...")
+                
+                # Additional response validation if provided
+                if check_response and callable(check_response):
+                    success = check_response(response_data)
+                    
+            except Exception as e:
+                lines.append(f"   Response parsing error: {e}")
+                if expected_status == 200:
+                    success = False
             
             if success:
-                try:
-                    response_data = response.json()
-                    print(f"   Response: {json.dumps(response_data, indent=2)[:200]}...")
-                    
-                    # Additional response validation if provided
-                    if check_response and callable(check_response):
-                        success = check_response(response_data)
-                        
-                except Exception as e:
-                    print(f"   Response parsing error: {e}")
-                    if expected_status == 200:
-                        success = False
-                
-                if success:
+                with self.lock:
                     self.tests_passed += 1
-                    print(f"✅ Passed")
-                else:
-                    print(f"❌ Failed - Response validation failed")
+                lines.append(f"✅ Passed")
             else:
-                print(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
-                try:
-                    error_response = response.json()
-                    print(f"   Error: {error_response}")
-                except:
-                    print(f"   Error: {response.text}")
-
-            return success, response.json() if success else {}
+                lines.append(f"❌ Failed - Response validation failed")
+        else:
+            lines.append(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
+            try:
+                error_response = orjson.loads(response.content)
+                lines.append(f"   Error: {error_response}")
+            except orjson.JSONDecodeError:
+                lines.append(f"   Error: {response.text}")
 
-        except requests.exceptions.Timeout:
-            print(f"❌ Failed - Request timeout")
-            return False, {}
-        except Exception as e:
-            print(f"❌ Failed - Error: {str(e)}")
-            return False, {}
+        log_block(lines, failed=not success)
+        self.results[name] = success
+        return success, response_data if success else {}
 
     def test_health_check(self):
         """Test health check endpoint"""
-        def validate_health(data):
-            return data.get('status') == 'healthy'
-            
         success, response = self.run_test(
             "Health Check",
             "GET",
             "api/health",
             200,
-            check_response=validate_health
+            check_response=_validate_health
         )
         return success
 
     def test_data_summary(self):
         """Test data summary endpoint"""
-        def validate_summary(data):
-            required_keys = ['sample_data', 'plan_data']
-            if not all(key in data for key in required_keys):
-                return False
-            
-            sample_data = data['sample_data']
-            plan_data = data['plan_data']
-            
-            # Check if sample_data has required fields
-            sample_required = ['rows', 'date_range', 'unique_lineups', 'unique_profiles']
-            plan_required = ['rows', 'date_range', 'unique_lineups']
-            
-            return (all(key in sample_data for key in sample_required) and
-                    all(key in plan_data for key in plan_required) and
-                    sample_data['rows'] > 0 and plan_data['rows'] > 0)
-            
         success, response = self.run_test(
             "Data Summary",
             "GET",
             "api/data/summary",
             200,
-            check_response=validate_summary
+            check_response=_validate_summary
         )
         return success, response
 
     def test_hierarchy(self):
         """Test hierarchy endpoint"""
-        def validate_hierarchy(data):
-            # Should return a nested dictionary structure
-            return isinstance(data, dict) and len(data) > 0
-            
         success, response = self.run_test(
             "Data Hierarchy",
             "GET",
             "api/data/hierarchy",
             200,
-            check_response=validate_hierarchy
+            check_response=_validate_hierarchy
         )
         return success, response
 
     def test_generate_forecasts(self):
         """Test forecast generation"""
-        def validate_forecast_generation(data):
-            required_keys = ['message', 'total_forecast_points', 'unique_lineups', 'forecast_period']
-            return (all(key in data for key in required_keys) and
-                    data['total_forecast_points'] > 0 and
-                    data['unique_lineups'] > 0)
-            
         success, response = self.run_test(
             "Generate Forecasts",
             "POST",
             "api/forecast/generate",
             200,
-            check_response=validate_forecast_generation
+            check_response=_validate_forecast_generation
         )
         
         if success:
@@ -145,39 +306,26 @@ class ForecastingAPITester:
     def test_combined_data(self):
         """Test combined data endpoint (requires forecasts to be generated first)"""
         if not self.forecast_generated:
-            print("⚠️  Skipping combined data test - forecasts not generated")
+            log.warning("⚠️  Skipping combined data test - forecasts not generated")
             return False, {}
             
-        def validate_combined_data(data):
-            required_keys = ['data', 'total_rows']
-            if not all(key in data for key in required_keys):
-                return False
-                
-            # Check if data array has items with expected structure
-            if len(data['data']) > 0:
-                sample_item = data['data'][0]
-                expected_columns = ['Profile', 'Lineup', 'DATE', 'Actual', 'Plan', 'Forecast']
-                return any(col in sample_item for col in expected_columns)
-            return True
-            
         success, response = self.run_test(
             "Combined Data",
             "GET",
             "api/data/combined",
             200,
-            check_response=validate_combined_data
+            check_response=_validate_combined_data
         )
         return success, response
 
     def test_lineup_data(self, lineup_name):
         """Test lineup-specific data endpoint"""
         if not self.forecast_generated:
-            print("⚠️  Skipping lineup data test - forecasts not generated")
+            log.warning("⚠️  Skipping lineup data test - forecasts not generated")
             return False, {}
             
         def validate_lineup_data(data):
-            required_keys = ['lineup', 'data', 'total_rows']
-            return (all(key in data for key in required_keys) and
+            return (_LINEUP_DATA_KEYS <= data.keys() and
                     data['lineup'] == lineup_name and
                     len(data['data']) > 0)
             
@@ -193,151 +341,126 @@ class ForecastingAPITester:
     def test_csv_export(self):
         """Test CSV export endpoint"""
         if not self.forecast_generated:
-            print("⚠️  Skipping CSV export test - forecasts not generated")
+            log.warning("⚠️  Skipping CSV export test - forecasts not generated")
             return False
             
-        url = f"{self.base_url}/api/export/csv"
-        self.tests_run += 1
-        print(f"\n🔍 Testing CSV Export...")
-        print(f"   URL: {url}")
+        url = self.urls['api/export/csv']
+        with self.lock:
+            self.tests_run += 1
+        lines = [f"\n🔍 Testing CSV Export...", f"   URL: {url}"]
         
+        start = time.perf_counter()
         try:
-            response = requests.get(url, timeout=30)
-            print(f"   Status Code: {response.status_code}")
-            
-            success = (response.status_code == 200 and 
-                      'text/csv' in response.headers.get('content-type', ''))
-            
-            if success:
-                self.tests_passed += 1
-                print(f"✅ Passed - CSV file received ({len(response.content)} bytes)")
-                # Check if CSV contains Synthetic_Actual column
-                csv_content = response.content.decode('utf-8')
-                if 'Synthetic_Actual' in csv_content:
-                    print("   ✅ CSV contains Synthetic_Actual column")
+            if self.fast_fail:
+                # Check status and content type without a body
+                head = self.session.head(url, timeout=self.TIMEOUT)
+                if head.status_code != 200 or 'text/csv' not in head.headers.get('content-type', ''):
+                    lines.append(f"❌ Failed - HEAD returned {head.status_code} ({head.headers.get('content-type', '')})")
+                    log_block(lines, failed=True)
+                    self.results['CSV Export'] = False
+                    return False
+
+            # Stream the body: only the byte count and the header row are needed
+            with self.session.get(url, stream=True, timeout=self.TIMEOUT) as response:
+                lines.append(f"   Status Code: {response.status_code}")
+                
+                success = (response.status_code == 200 and 
+                          'text/csv' in response.headers.get('content-type', ''))
+                
+                if success:
+                    total_bytes = 0
+                    header = b''
+                    for chunk in response.iter_content(65536):
+                        total_bytes += len(chunk)
+                        if b'\n' not in header:
+                            header += chunk
+                    
+                    with self.lock:
+                        self.tests_passed += 1
+                    lines.append(f"✅ Passed - CSV file received ({total_bytes} bytes in {(time.perf_counter() - start) * 1000:.1f}ms)")
+                    # Check if CSV contains Synthetic_Actual column
+                    if b'Synthetic_Actual' in header.split(b'\n', 1)[0]:
+                        lines.append("   ✅ CSV contains Synthetic_Actual column")
+                    else:
+                        lines.append("   ⚠️  CSV missing Synthetic_Actual column")
                 else:
-                    print("   ⚠️  CSV missing Synthetic_Actual column")
-            else:
-                print(f"❌ Failed - Invalid response or content type")
+                    lines.append(f"❌ Failed - Invalid response or content type")
                 
+            log_block(lines, failed=not success)
+            self.results['CSV Export'] = success
             return success
             
-        except Exception as e:
-            print(f"❌ Failed - Error: {str(e)}")
+        except self.request_errors as e:
+            lines.append(f"❌ Failed - Error: {str(e)}")
+            log_block(lines, failed=True)
+            self.results['CSV Export'] = False
             return False
 
     def test_filtered_data(self):
         """Test NEW filtered data endpoint with hierarchy parameters"""
         if not self.forecast_generated:
-            print("⚠️  Skipping filtered data test - forecasts not generated")
+            log.warning("⚠️  Skipping filtered data test - forecasts not generated")
             return False, {}
             
-        def validate_filtered_data(data):
-            required_keys = ['data', 'total_rows', 'filters_applied']
-            return all(key in data for key in required_keys)
-            
         success, response = self.run_test(
             "Filtered Data (NEW)",
             "GET",
             "api/data/filtered",
             200,
-            check_response=validate_filtered_data
+            check_response=_validate_filtered_data
         )
         return success, response
 
     def test_yearly_summary(self):
         """Test NEW yearly summary endpoint for visualization"""
         if not self.forecast_generated:
-            print("⚠️  Skipping yearly summary test - forecasts not generated")
+            log.warning("⚠️  Skipping yearly summary test - forecasts not generated")
             return False, {}
             
-        def validate_yearly_summary(data):
-            required_keys = ['yearly_data', 'available_years']
-            if not all(key in data for key in required_keys):
-                return False
-            
-            # Check if yearly_data has proper structure
-            if len(data['yearly_data']) > 0:
-                year_data = data['yearly_data'][0]
-                year_required = ['year', 'months']
-                if not all(key in year_data for key in year_required):
-                    return False
-                
-                # Check months structure
-                if len(year_data['months']) > 0:
-                    month_data = year_data['months'][0]
-                    month_required = ['month', 'month_name', 'actual', 'plan', 'forecast', 'synthetic_actual']
-                    return all(key in month_data for key in month_required)
-            
-            return True
-            
         success, response = self.run_test(
             "Yearly Summary (NEW)",
             "GET",
             "api/data/yearly-summary",
             200,
-            check_response=validate_yearly_summary
+            check_response=_validate_yearly_summary
         )
         return success, response
 
     def test_hierarchy_options(self):
         """Test NEW hierarchy options endpoint for filter dropdowns"""
         if not self.forecast_generated:
-            print("⚠️  Skipping hierarchy options test - forecasts not generated")
+            log.warning("⚠️  Skipping hierarchy options test - forecasts not generated")
             return False, {}
             
-        def validate_hierarchy_options(data):
-            required_keys = ['profiles', 'line_items', 'bodies', 'sites', 'lineups']
-            if not all(key in data for key in required_keys):
-                return False
-            
-            # Check if all are lists with content
-            return all(isinstance(data[key], list) and len(data[key]) > 0 for key in required_keys)
-            
         success, response = self.run_test(
             "Hierarchy Options (NEW)",
             "GET",
             "api/data/hierarchy-options",
             200,
-            check_response=validate_hierarchy_options
+            check_response=_validate_hierarchy_options
         )
         return success, response
 
     def test_filtered_data_with_params(self, profile=None, line_item=None, body=None, site=None, lineup=None):
         """Test filtered data with specific hierarchy parameters"""
         if not self.forecast_generated:
-            print("⚠️  Skipping filtered data with params test - forecasts not generated")
+            log.warning("⚠️  Skipping filtered data with params test - forecasts not generated")
             return False, {}
         
-        params = []
-        if profile: params.append(f"profile={profile}")
-        if line_item: params.append(f"line_item={line_item}")
-        if body: params.append(f"body={body}")
-        if site: params.append(f"site={site}")
-        if lineup: params.append(f"lineup={lineup}")
+        params = {key: value for key, value in (('profile', profile), ('line_item', line_item), ('body', body),
+                                                ('site', site), ('lineup', lineup)) if value}
         
-        query_string = "&".join(params)
+        # urlencode escapes hierarchy values containing spaces or '&'
+        query_string = urlencode(params)
         endpoint = f"api/data/filtered?{query_string}" if query_string else "api/data/filtered"
         
         def validate_filtered_data_with_params(data):
-            required_keys = ['data', 'total_rows', 'filters_applied']
-            if not all(key in data for key in required_keys):
+            if not _FILTERED_DATA_KEYS <= data.keys():
                 return False
             
             # Validate filters_applied matches what we sent
             filters = data['filters_applied']
-            if profile and filters.get('profile') != profile:
-                return False
-            if line_item and filters.get('line_item') != line_item:
-                return False
-            if body and filters.get('body') != body:
-                return False
-            if site and filters.get('site') != site:
-                return False
-            if lineup and filters.get('lineup') != lineup:
-                return False
-                
-            return True
+            return all(filters.get(key) == value for key, value in params.items())
             
         success, response = self.run_test(
             f"Filtered Data with Params ({query_string})",
@@ -350,174 +473,190 @@ class ForecastingAPITester:
 
     def test_synthetic_actuals_validation(self, combined_data):
         """Validate that synthetic actuals are properly calculated (seasonal averages)"""
-        print(f"\n🔍 Validating Synthetic Actuals Calculation...")
+        lines = [f"\n🔍 Validating Synthetic Actuals Calculation..."]
         
         if not combined_data or 'data' not in combined_data:
-            print("❌ No combined data available for validation")
+            lines.append("❌ No combined data available for validation")
+            log_block(lines, failed=True)
             return False
         
-        data = combined_data['data']
+        df = pd.DataFrame(combined_data['data'], columns=['Lineup', 'DATE', 'Actual', 'Synthetic_Actual'])
+        dates = df['DATE'].fillna('')
+        # DATE is ISO formatted, so year and month are fixed-position slices
+        df = df[df['Lineup'].notna() & (df['Lineup'] != '') & (dates.str.len() >= 10)]
+        dates = dates[df.index]
+        df = df.assign(month=pd.to_numeric(dates.str[5:7]), is_2025=dates.str.startswith('2025'))
         
-        # Group data by lineup and check synthetic actuals
-        lineup_data = {}
-        for item in data:
-            lineup = item.get('Lineup')
-            if not lineup:
-                continue
-                
-            if lineup not in lineup_data:
-                lineup_data[lineup] = {'historical': [], 'synthetic': []}
-            
-            date_str = item.get('DATE', '')
-            if date_str.startswith('2025') and item.get('Synthetic_Actual') is not None:
-                lineup_data[lineup]['synthetic'].append({
-                    'month': int(date_str.split('-')[1]),
-                    'value': item['Synthetic_Actual']
-                })
-            elif not date_str.startswith('2025') and item.get('Actual') is not None:
-                lineup_data[lineup]['historical'].append({
-                    'month': int(date_str.split('-')[1]),
-                    'value': item['Actual']
-                })
+        # Synthetic actuals should be the seasonal average of the historical actuals for
+        # the same lineup and month; months without history are not checked
+        historical = df[~df['is_2025'] & df['Actual'].notna()]
+        synthetic = df[df['is_2025'] & df['Synthetic_Actual'].notna()]
+        expected = historical.groupby(['Lineup', 'month'], sort=False)['Actual'].mean().rename('Expected')
+        checked = synthetic.join(expected, on=['Lineup', 'month'], how='inner')
+        # Allow for small floating point differences
+        mismatched = (checked['Synthetic_Actual'] - checked['Expected']).abs() > 0.01
         
-        validation_passed = True
-        for lineup, data_dict in lineup_data.items():
-            if not data_dict['synthetic'] or not data_dict['historical']:
-                continue
-                
-            print(f"   Checking lineup: {lineup}")
-            
-            # Check if synthetic actuals make sense (should be seasonal averages)
-            for synthetic_item in data_dict['synthetic']:
-                month = synthetic_item['month']
-                synthetic_value = synthetic_item['value']
-                
-                # Get historical values for the same month
-                historical_month_values = [
-                    h['value'] for h in data_dict['historical'] 
-                    if h['month'] == month
-                ]
-                
-                if historical_month_values:
-                    expected_avg = sum(historical_month_values) / len(historical_month_values)
-                    # Allow for small floating point differences
-                    if abs(synthetic_value - expected_avg) > 0.01:
-                        print(f"   ⚠️  Month {month}: Synthetic={synthetic_value:.2f}, Expected Avg={expected_avg:.2f}")
-                        validation_passed = False
-                    else:
-                        print(f"   ✅ Month {month}: Synthetic={synthetic_value:.2f} matches expected average")
+        for lineup, rows in checked.groupby('Lineup', sort=False):
+            lines.append(f"   Checking lineup: {lineup}")
+            for row in rows.itertuples():
+                if mismatched[row.Index]:
+                    lines.append(f"   ⚠️  Month {row.month}: Synthetic={row.Synthetic_Actual:.2f}, Expected Avg={row.Expected:.2f}")
+                else:
+                    lines.append(f"   ✅ Month {row.month}: Synthetic={row.Synthetic_Actual:.2f} matches expected average")
+        
+        validation_passed = not mismatched.any()
         
         if validation_passed:
-            print("✅ Synthetic actuals validation passed")
+            lines.append("✅ Synthetic actuals validation passed")
         else:
-            print("❌ Synthetic actuals validation failed")
+            lines.append("❌ Synthetic actuals validation failed")
+        log_block(lines, failed=not validation_passed)
             
         return validation_passed
 
 def main():
     # Setup
     tester = ForecastingAPITester("https://805b056d-d979-4878-b784-e89e50fd864c.preview.emergentagent.com")
-    
-    print("🚀 Starting Enhanced Forecasting API Tests")
-    print("=" * 60)
-
-    # Test 1: Health Check
-    if not tester.test_health_check():
-        print("❌ Health check failed, stopping tests")
-        return 1
-
-    # Test 2: Data Summary
-    summary_success, summary_data = tester.test_data_summary()
-    if not summary_success:
-        print("❌ Data summary failed, stopping tests")
-        return 1
-
-    # Test 3: Hierarchy
-    hierarchy_success, hierarchy_data = tester.test_hierarchy()
-    if not hierarchy_success:
-        print("❌ Hierarchy test failed")
-
-    # Test 4: Generate Forecasts (This creates synthetic actuals)
-    forecast_success, forecast_data = tester.test_generate_forecasts()
-    if not forecast_success:
-        print("❌ Forecast generation failed")
-        return 1
-
-    # Test 5: Combined Data (after forecast generation)
-    combined_success, combined_data = tester.test_combined_data()
-
-    # Test 6: NEW - Hierarchy Options for filter dropdowns
-    hierarchy_options_success, hierarchy_options_data = tester.test_hierarchy_options()
-
-    # Test 7: NEW - Yearly Summary for visualization
-    yearly_summary_success, yearly_summary_data = tester.test_yearly_summary()
-
-    # Test 8: NEW - Filtered Data (no params)
-    filtered_data_success, filtered_data_response = tester.test_filtered_data()
-
-    # Test 9: NEW - Filtered Data with specific parameters
-    if hierarchy_options_success and hierarchy_options_data:
-        # Test with first available options
-        profiles = hierarchy_options_data.get('profiles', [])
-        lineups = hierarchy_options_data.get('lineups', [])
-        
-        if profiles:
-            profile_filter_success, _ = tester.test_filtered_data_with_params(profile=profiles[0])
-        
-        if lineups:
-            lineup_filter_success, _ = tester.test_filtered_data_with_params(lineup=lineups[0])
-
-    # Test 10: Lineup Data (get first available lineup)
-    lineup_name = None
-    if hierarchy_success and hierarchy_data:
-        # Extract first lineup from hierarchy
-        for profile in hierarchy_data:
-            for line_item in hierarchy_data[profile]:
-                for site in hierarchy_data[profile][line_item]:
-                    if hierarchy_data[profile][line_item][site]:
-                        lineup_name = hierarchy_data[profile][line_item][site][0]
-                        break
-                if lineup_name:
-                    break
-            if lineup_name:
-                break
-    
-    if lineup_name:
-        lineup_success, lineup_data = tester.test_lineup_data(lineup_name)
+    # TEST_CASSETTE=fixtures/api_responses.yaml replays recorded responses offline (needs
+    # vcrpy); with TEST_RECORD=1 requests missing from the cassette hit the backend and
+    # are recorded
+    cassette_path = os.getenv('TEST_CASSETTE')
+    if cassette_path:
+        import vcr
+        from vcr.errors import CannotOverwriteExistingCassetteException
+        record_mode = 'new_episodes' if bool(int(os.getenv('TEST_RECORD', '0'))) else 'none'
+        cassette = vcr.use_cassette(cassette_path, record_mode=record_mode)
+        # A request missing from the cassette (or a missing cassette) fails that test
+        tester.request_errors += (CannotOverwriteExistingCassetteException,)
     else:
-        print("⚠️  No lineup found for testing")
+        cassette = nullcontext()
+    try:
+        with cassette:
+            # vcrpy cassettes are not thread-safe, so recorded runs go one request at a time
+            return run_tests(tester, max_workers=1 if cassette_path else 6)
+    finally:
+        tester.session.close()
+        log_buffer.flush()
+
+def run_tests(tester, max_workers=6):
+    log.info("🚀 Starting Enhanced Forecasting API Tests")
+    log.info("=" * 60)
+
+    # Independent requests run concurrently; each phase waits only on what it depends on
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Tests 1-3: Health Check, Data Summary and Hierarchy have no ordering constraint
+        health_future = pool.submit(tester.test_health_check)
+        summary_future = pool.submit(tester.test_data_summary)
+        hierarchy_future = pool.submit(tester.test_hierarchy)
+
+        if not health_future.result():
+            log.error("❌ Health check failed, stopping tests")
+            return 1
+
+        summary_success, summary_data = summary_future.result()
+        if not summary_success:
+            log.error("❌ Data summary failed, stopping tests")
+            return 1
+
+        # Test 4: Generate Forecasts (This creates synthetic actuals); the hierarchy
+        # result is checked and parsed while the server fits the models
+        forecast_future = pool.submit(tester.test_generate_forecasts)
+
+        hierarchy_success, hierarchy_data = hierarchy_future.result()
+        if not hierarchy_success:
+            log.error("❌ Hierarchy test failed")
+
+        # Get first available lineup from the hierarchy for the lineup data test
+        lineup_name = None
+        if hierarchy_success and hierarchy_data:
+            lineup_name = next(
+                (lineups[0]
+                 for line_items in hierarchy_data.values()
+                 for sites in line_items.values()
+                 for lineups in sites.values() if lineups),
+                None
+            )
+
+        forecast_success, forecast_data = forecast_future.result()
+        if not forecast_success:
+            log.error("❌ Forecast generation failed")
+            return 1
+
+        # Tests 5-8, 10 and 12 only need the generated forecasts
+        combined_future = pool.submit(tester.test_combined_data)
+        hierarchy_options_future = pool.submit(tester.test_hierarchy_options)
+        yearly_summary_future = pool.submit(tester.test_yearly_summary)
+        filtered_data_future = pool.submit(tester.test_filtered_data)
+        lineup_future = pool.submit(tester.test_lineup_data, lineup_name) if lineup_name else None
+        csv_future = pool.submit(tester.test_csv_export)
+
+        # Test 5: Combined Data (after forecast generation)
+        combined_success, combined_data = combined_future.result()
+
+        # Test 6: NEW - Hierarchy Options for filter dropdowns
+        hierarchy_options_success, hierarchy_options_data = hierarchy_options_future.result()
+
+        # Test 7: NEW - Yearly Summary for visualization
+        yearly_summary_future.result()
+
+        # Test 8: NEW - Filtered Data (no params)
+        filtered_data_future.result()
+
+        # Test 9: NEW - Filtered Data with specific parameters
+        if hierarchy_options_success and hierarchy_options_data:
+            # Test with first available options
+            profiles = hierarchy_options_data.get('profiles', [])
+            lineups = hierarchy_options_data.get('lineups', [])
+
+            filter_futures = []
+            if profiles:
+                filter_futures.append(pool.submit(tester.test_filtered_data_with_params, profile=profiles[0]))
+            if lineups:
+                filter_futures.append(pool.submit(tester.test_filtered_data_with_params, lineup=lineups[0]))
+            for future in filter_futures:
+                future.result()
+
+        # Test 10: Lineup Data
+        if lineup_future:
+            lineup_future.result()
+        else:
+            log.warning("⚠️  No lineup found for testing")
 
-    # Test 11: Synthetic Actuals Validation
-    if combined_success and combined_data:
-        synthetic_validation = tester.test_synthetic_actuals_validation(combined_data)
+        # Test 11: Synthetic Actuals Validation
+        if combined_success and combined_data:
+            tester.test_synthetic_actuals_validation(combined_data)
 
-    # Test 12: CSV Export (should include Synthetic_Actual column)
-    csv_success = tester.test_csv_export()
+        # Test 12: CSV Export (should include Synthetic_Actual column)
+        csv_future.result()
 
     # Print results
-    print("\n" + "=" * 60)
-    print(f"📊 Test Results: {tester.tests_passed}/{tester.tests_run} tests passed")
+    log.info("\n" + "=" * 60)
+    log.info(f"📊 Test Results: {tester.tests_passed}/{tester.tests_run} tests passed")
     
     # Summary of key features tested
-    print("\n🔍 Key Features Tested:")
-    print(f"   ✅ Health Check: {'✅' if tester.test_health_check else '❌'}")
-    print(f"   ✅ Data Summary: {'✅' if summary_success else '❌'}")
-    print(f"   ✅ Hierarchy Structure: {'✅' if hierarchy_success else '❌'}")
-    print(f"   ✅ Forecast Generation: {'✅' if forecast_success else '❌'}")
-    print(f"   ✅ Combined Data: {'✅' if combined_success else '❌'}")
-    print(f"   🆕 Hierarchy Options (NEW): {'✅' if hierarchy_options_success else '❌'}")
-    print(f"   🆕 Yearly Summary (NEW): {'✅' if yearly_summary_success else '❌'}")
-    print(f"   🆕 Filtered Data (NEW): {'✅' if filtered_data_success else '❌'}")
-    print(f"   ✅ Lineup Data: {'✅' if lineup_name and lineup_success else '❌'}")
-    print(f"   ✅ CSV Export with Synthetic_Actual: {'✅' if csv_success else '❌'}")
+    log.info("\n🔍 Key Features Tested:")
+    key_features = (
+        ('✅ Health Check', 'Health Check'),
+        ('✅ Data Summary', 'Data Summary'),
+        ('✅ Hierarchy Structure', 'Data Hierarchy'),
+        ('✅ Forecast Generation', 'Generate Forecasts'),
+        ('✅ Combined Data', 'Combined Data'),
+        ('🆕 Hierarchy Options (NEW)', 'Hierarchy Options (NEW)'),
+        ('🆕 Yearly Summary (NEW)', 'Yearly Summary (NEW)'),
+        ('🆕 Filtered Data (NEW)', 'Filtered Data (NEW)'),
+        ('✅ Lineup Data', f"Lineup Data ({lineup_name})"),
+        ('✅ CSV Export with Synthetic_Actual', 'CSV Export'),
+    )
+    for label, test_name in key_features:
+        log.info(f"   {label}: {'✅' if tester.results.get(test_name) else '❌'}")
     
     if tester.tests_passed == tester.tests_run:
-        print("\n🎉 All API tests passed!")
-        print("✅ Backend is ready for frontend testing")
+        log.info("\n🎉 All API tests passed!")
+        log.info("✅ Backend is ready for frontend testing")
         return 0
     else:
-        print(f"\n⚠️  {tester.tests_run - tester.tests_passed} tests failed")
-        print("❌ Fix backend issues before proceeding to frontend testing")
+        log.warning(f"\n⚠️  {tester.tests_run - tester.tests_passed} tests failed")
+        log.error("❌ Fix backend issues before proceeding to frontend testing")
         return 1
 
 if __name__ == "__main__":